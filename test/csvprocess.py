@@ -1,8 +1,73 @@
+import mmap
 import os
-import csv
-import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Linux上装了liburing时，批量清理通过io_uring提交读写请求：单线程就能
+# 让多个文件的磁盘I/O在内核里并发排队，省去线程池和逐文件的同步系统
+# 调用；其他平台或没装liburing则退回线程池
+if sys.platform == 'linux':
+    try:
+        import liburing
+    except ImportError:
+        liburing = None
+else:
+    liburing = None
+
+# numba可用时用JIT编译的扫描器定位空行（接近C的速度，且nogil=True
+# 让多线程清理时真正并行）；没装numba则退回纯Python逐行扫描
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _blank_line_spans(buf):
+        """返回所有空行的[start, end)字节区间（end含行尾换行符）"""
+        n = buf.size
+
+        # 第一遍：数空行，确定结果数组大小
+        count = 0
+        line_start = 0
+        blank = True
+        for i in range(n):
+            c = buf[i]
+            if c == 10:  # \n
+                if blank:
+                    count += 1
+                line_start = i + 1
+                blank = True
+            elif c != 32 and c != 9 and c != 13:  # 空格/制表符/回车之外
+                blank = False
+        if line_start < n and blank:  # 末尾无换行符的空白行
+            count += 1
+
+        # 第二遍：记录区间
+        spans = np.empty((count, 2), dtype=np.int64)
+        k = 0
+        line_start = 0
+        blank = True
+        for i in range(n):
+            c = buf[i]
+            if c == 10:
+                if blank:
+                    spans[k, 0] = line_start
+                    spans[k, 1] = i + 1
+                    k += 1
+                line_start = i + 1
+                blank = True
+            elif c != 32 and c != 9 and c != 13:
+                blank = False
+        if line_start < n and blank:
+            spans[k, 0] = line_start
+            spans[k, 1] = n
+
+        return spans
+
 def process_csv_folder_remove_empty_rows(input_folder, output_folder=None, delete_original=True):
     """
     处理文件夹中所有CSV文件，删除空行后保存到新文件夹，并可选择删除原文件
@@ -38,8 +103,9 @@ def process_csv_folder_remove_empty_rows(input_folder, output_folder=None, delet
         'processed_file_details': []
     }
     
-    # 获取所有CSV文件
-    csv_files = list(input_path.glob("*.csv"))
+    # 获取所有CSV文件（os.scandir比glob省去逐项stat，目录很大时明显更快）
+    csv_files = [Path(entry.path) for entry in os.scandir(input_path)
+                 if entry.is_file() and entry.name.endswith('.csv')]
     stats['total_files'] = len(csv_files)
     
     if not csv_files:
@@ -47,49 +113,24 @@ def process_csv_folder_remove_empty_rows(input_folder, output_folder=None, delet
         return stats
     
     """ print(f"找到 {len(csv_files)} 个CSV文件，开始处理...") """
-    
-    # 处理每个CSV文件
-    for csv_file in csv_files:
-        try:
-            """ print(f"处理文件: {csv_file.name}") """
-            
-            # 输出文件路径
-            output_file = output_path / csv_file.name
-            
-            # 处理CSV文件（删除空行）
-            empty_rows_removed = process_single_csv_file(csv_file, output_file)
-            
-            # 记录处理详情
-            file_stats = {
-                'filename': csv_file.name,
-                'original_path': str(csv_file),
-                'processed_path': str(output_file),
-                'empty_rows_removed': empty_rows_removed
-            }
-            stats['processed_file_details'].append(file_stats)
-            stats['empty_rows_removed'] += empty_rows_removed
-            stats['processed_files'] += 1
-            
-            """ print(f"  成功处理，删除了 {empty_rows_removed} 个空行") """
-            
-        except Exception as e:
-            error_msg = f"处理文件 {csv_file.name} 时出错: {str(e)}"
-            print(f"  {error_msg}")
-            stats['failed_files'].append({
-                'filename': csv_file.name,
-                'error': str(e)
-            })
-    
+
+    # Linux上优先用io_uring批量提交读写，不可用时退回线程池
+    if liburing is not None and _process_files_io_uring(csv_files, output_path, stats):
+        pass
+    else:
+        _process_files_threadpool(csv_files, output_path, stats)
+
     # 如果要求删除原文件且所有文件都处理成功
+    # （路径预先转成str，直接走os.remove，绕开pathlib的包装开销）
     if delete_original and not stats['failed_files']:
         """ print(f"\n正在删除原文件夹中的CSV文件...") """
-        for csv_file in csv_files:
+        for path in [str(csv_file) for csv_file in csv_files]:
             try:
-                csv_file.unlink()
-                """ print(f"  已删除: {csv_file.name}") """
-            except Exception as e:
-                print(f"  删除文件 {csv_file.name} 失败: {e}")
-    
+                os.remove(path)
+                """ print(f"  已删除: {path}") """
+            except OSError as e:
+                print(f"  删除文件 {os.path.basename(path)} 失败: {e}")
+
     # 打印汇总信息
     """ print(f"\n处理完成！")
     print(f"总文件数: {stats['total_files']}")
@@ -97,38 +138,300 @@ def process_csv_folder_remove_empty_rows(input_folder, output_folder=None, delet
     print(f"失败文件: {len(stats['failed_files'])}")
     print(f"总共删除空行: {stats['empty_rows_removed']}")
     print(f"处理后的文件保存在: {output_path}") """
-    
+
     if delete_original and not stats['failed_files']:
         print(f"原文件夹中的CSV文件已删除")
-    
+
     return stats
 
+def _process_files_threadpool(csv_files, output_path, stats):
+    """用线程池并行清理CSV文件（每个文件的处理相互独立，属于I/O密集型任务）"""
+    stats_lock = threading.Lock()
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process_single_csv_file, csv_file, output_path / csv_file.name): csv_file
+            for csv_file in csv_files
+        }
+
+        for future in as_completed(futures):
+            csv_file = futures[future]
+            try:
+                empty_rows_removed = future.result()
+
+                # 记录处理详情（加锁保护stats）
+                file_stats = {
+                    'filename': csv_file.name,
+                    'original_path': str(csv_file),
+                    'processed_path': str(output_path / csv_file.name),
+                    'empty_rows_removed': empty_rows_removed
+                }
+                with stats_lock:
+                    stats['processed_file_details'].append(file_stats)
+                    stats['empty_rows_removed'] += empty_rows_removed
+                    stats['processed_files'] += 1
+
+                """ print(f"  成功处理，删除了 {empty_rows_removed} 个空行") """
+
+            except Exception as e:
+                error_msg = f"处理文件 {csv_file.name} 时出错: {str(e)}"
+                print(f"  {error_msg}")
+                with stats_lock:
+                    stats['failed_files'].append({
+                        'filename': csv_file.name,
+                        'error': str(e)
+                    })
+
+# io_uring一次在途的请求数（队列深度）
+_URING_DEPTH = 64
+
+def _filter_blank_lines(content):
+    """
+    删除content中的空行（与process_single_csv_file同样的字节级语义）
+
+    返回:
+        (过滤后的bytes, 删除的空行数)
+    """
+    lines = content.split(b'\n')
+    tail = lines.pop()  # 最后一个\n之后的部分（可能为空）
+    kept = [line + b'\n' for line in lines if line.strip(b' \t\r')]
+    removed = len(lines) - len(kept)
+    if tail:
+        if tail.strip(b' \t\r'):
+            kept.append(tail)
+        else:
+            removed += 1
+    return b''.join(kept), removed
+
+def _process_files_io_uring(csv_files, output_path, stats):
+    """
+    用io_uring批量清理CSV文件
+
+    每个文件走"提交读SQE -> 完成后在内存里过滤空行 -> 提交写SQE"的
+    流水线，最多_URING_DEPTH个文件的I/O同时在内核里排队，阻塞的
+    read/write系统调用全部换成SQE的提交和收割。
+
+    返回:
+        bool: False表示io_uring不可用（调用方应退回线程池路径）
+    """
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(_URING_DEPTH, ring, 0)
+    except OSError:
+        # 内核禁用或不支持io_uring
+        return False
+
+    def _sqe():
+        sqe = liburing.io_uring_get_sqe(ring)
+        while sqe is None:  # 提交队列满，先刷一批出去
+            liburing.io_uring_submit(ring)
+            sqe = liburing.io_uring_get_sqe(ring)
+        return sqe
+
+    def _finish(state):
+        stats['processed_file_details'].append({
+            'filename': state['file'].name,
+            'original_path': str(state['file']),
+            'processed_path': str(state['output']),
+            'empty_rows_removed': state['removed']
+        })
+        stats['empty_rows_removed'] += state['removed']
+        stats['processed_files'] += 1
+
+    def _fail(state, error):
+        error_msg = f"处理文件 {state['file'].name} 时出错: {error}"
+        print(f"  {error_msg}")
+        stats['failed_files'].append({
+            'filename': state['file'].name,
+            'error': str(error)
+        })
+
+    cqe = liburing.Cqe()
+    queue = list(csv_files)
+    pending = {}  # user_data -> 文件状态
+    token = 0
+
+    try:
+        while queue or pending:
+            # 把空闲的队列深度填满新的读请求
+            while queue and len(pending) < _URING_DEPTH:
+                csv_file = queue.pop()
+                output_file = output_path / csv_file.name
+                state = {'file': csv_file, 'output': output_file,
+                         'in_fd': -1, 'out_fd': -1, 'removed': 0, 'data': None}
+                try:
+                    state['in_fd'] = os.open(csv_file, os.O_RDONLY)
+                    size = os.fstat(state['in_fd']).st_size
+                    if size == 0:
+                        # 空文件直接生成空输出，不占用队列
+                        os.close(state['in_fd'])
+                        state['in_fd'] = -1
+                        with open(output_file, 'wb'):
+                            pass
+                        _finish(state)
+                        continue
+                except OSError as e:
+                    if state['in_fd'] != -1:
+                        os.close(state['in_fd'])
+                    _fail(state, e)
+                    continue
+
+                state['buf'] = bytearray(size)
+                state['size'] = size
+                state['phase'] = 'read'
+                sqe = _sqe()
+                liburing.io_uring_prep_read(sqe, state['in_fd'], state['buf'], 0)
+                sqe.user_data = token
+                pending[token] = state
+                token += 1
+
+            liburing.io_uring_submit(ring)
+            if not pending:
+                continue
+
+            # 收割一个完成事件并推进对应文件的流水线
+            liburing.io_uring_wait_cqe(ring, cqe)
+            entry = cqe[0]
+            state = pending.pop(entry.user_data)
+            res = entry.res
+            liburing.io_uring_cqe_seen(ring, entry)
+
+            try:
+                if res < 0:
+                    raise OSError(-res, os.strerror(-res))
+
+                if state['phase'] == 'read':
+                    # 罕见的短读用pread循环补齐，不值得为它多一轮流水线；
+                    # 补不满（文件被截断等）必须报错，不能按残缺内容处理
+                    nread = res
+                    while nread < state['size']:
+                        chunk = os.pread(
+                            state['in_fd'], state['size'] - nread, nread)
+                        if not chunk:
+                            raise OSError(
+                                f"读取在 {nread}/{state['size']} 字节处提前结束")
+                        state['buf'][nread:nread + len(chunk)] = chunk
+                        nread += len(chunk)
+                    os.close(state['in_fd'])
+                    state['in_fd'] = -1
+
+                    data, removed = _filter_blank_lines(state['buf'])
+                    state['data'] = data
+                    state['removed'] = removed
+                    state['out_fd'] = os.open(
+                        state['output'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    if not data:
+                        os.close(state['out_fd'])
+                        state['out_fd'] = -1
+                        _finish(state)
+                        continue
+
+                    state['phase'] = 'write'
+                    sqe = _sqe()
+                    liburing.io_uring_prep_write(sqe, state['out_fd'], state['data'], 0)
+                    sqe.user_data = token
+                    pending[token] = state
+                    token += 1
+                else:
+                    # 写完成；短写同样循环补齐，写不动时报错，
+                    # 绝不能让残缺的输出被当作处理成功（原文件会被删除）
+                    data = state['data']
+                    nwritten = res
+                    while nwritten < len(data):
+                        n = os.pwrite(state['out_fd'], data[nwritten:], nwritten)
+                        if n == 0:
+                            raise OSError(
+                                f"写入在 {nwritten}/{len(data)} 字节处停止")
+                        nwritten += n
+                    os.close(state['out_fd'])
+                    state['out_fd'] = -1
+                    _finish(state)
+            except OSError as e:
+                for key in ('in_fd', 'out_fd'):
+                    if state[key] != -1:
+                        os.close(state[key])
+                _fail(state, e)
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+    return True
+
 def process_single_csv_file(input_file, output_file):
     """
     处理单个CSV文件，删除空行
-    
+
+    示波器生成的CSV内容简单（元数据注释 + "Time,Voltage"数值行），
+    空行就是只含空白字符的行，直接在字节层面按行过滤即可，
+    无需经过csv模块逐字段解析，大文件下快一个数量级以上。
+    输入通过mmap映射后用find(b'\\n')扫描，省去read系统调用和
+    分块拼接；输出走1 MiB缓冲的写入。
+
     参数:
         input_file: 输入文件路径
         output_file: 输出文件路径
-    
+
     返回:
         int: 删除的空行数
     """
     empty_rows_count = 0
-    
-    with open(input_file, 'r', newline='', encoding='utf-8') as infile, \
-         open(output_file, 'w', newline='', encoding='utf-8') as outfile:
-        
-        reader = csv.reader(infile)
-        writer = csv.writer(outfile)
-        
-        for row in reader:
-            # 检查行是否为空（所有字段都为空或只包含空格）
-            if any(field.strip() for field in row):
-                writer.writerow(row)
-            else:
-                empty_rows_count += 1
-    
+
+    with open(input_file, 'rb') as infile, \
+         open(output_file, 'wb', buffering=1024 * 1024) as outfile:
+
+        size = os.fstat(infile.fileno()).st_size
+        if size == 0:
+            return 0
+
+        mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # 快速路径：空行意味着某一行以空白字符开头（\n后面紧跟
+            # \n/\r/空格/制表符，或文件开头就是空白）。如果整个文件
+            # 都不存在这种模式，就不可能有空行，直接整块拷贝到输出，
+            # 吞吐量接近纯I/O上限
+            if (mm[0:1] not in (b'\n', b'\r', b' ', b'\t')
+                    and mm.find(b'\n\n') == -1
+                    and mm.find(b'\n\r') == -1
+                    and mm.find(b'\n ') == -1
+                    and mm.find(b'\n\t') == -1):
+                outfile.write(mm)
+                return 0
+
+            # JIT路径：一次扫描找出全部空行区间，
+            # 再把空行之间的大段内容整块写出
+            if njit is not None:
+                spans = _blank_line_spans(np.frombuffer(mm, dtype=np.uint8))
+                prev = 0
+                for i in range(len(spans)):
+                    start, end = spans[i, 0], spans[i, 1]
+                    if start > prev:
+                        outfile.write(mm[prev:start])
+                    prev = end
+                if prev < size:
+                    outfile.write(mm[prev:size])
+                return len(spans)
+
+            pos = 0
+            while pos < size:
+                nl = mm.find(b'\n', pos)
+                if nl == -1:
+                    # 文件末尾没有换行符的最后一行
+                    line = mm[pos:size]
+                    pos = size
+                    newline = b''
+                else:
+                    line = mm[pos:nl]
+                    pos = nl + 1
+                    newline = b'\n'
+
+                # 只含空格/制表符/回车的行视为空行
+                if line.strip(b' \t\r'):
+                    outfile.write(line + newline)
+                else:
+                    empty_rows_count += 1
+        finally:
+            mm.close()
+
     return empty_rows_count
 
 # 使用示例
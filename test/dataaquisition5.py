@@ -1,11 +1,45 @@
+import gzip
+import io
 import pyvisa
 import numpy as np
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 import time
 import os
 
+@dataclass
+class Waveform:
+    """一次采集得到的波形：两个大数组 + 标量元数据"""
+    time: np.ndarray
+    voltage: np.ndarray
+    meta: dict
+
 class SiglentSDS3104X_DataAcquisition:
+    # 全部实例共享一个ResourceManager，避免每个实例重复初始化VISA后端
+    _rm = None
+
+    # CSV元数据模板（类级常量，保存时只做一次format_map填充）
+    _META_TMPL = (
+        "# Siglent SDS3104X HD Oscilloscope Data\n"
+        "# Acquisition Time: {acquisition_time}\n"
+        "# Channel: {channel}\n"
+        "# Vertical Scale: {vdiv} V/div\n"
+        "# Vertical Offset: {offset} V\n"
+        "# Timebase Scale: {tdiv} s/div\n"
+        "# Sample Rate: {sample_rate:.2f} Sa/s\n"
+        "# Number of Points: {num_points}\n"
+        "# Trigger Mode: Current Setting (Not Modified)\n"
+        "# Acquisition Mode: Current Setting (Not Modified)\n"
+    )
+
+    @classmethod
+    def _get_rm(cls):
+        """获取共享的ResourceManager（首次调用时创建）"""
+        if cls._rm is None:
+            cls._rm = pyvisa.ResourceManager()
+        return cls._rm
+
     def __init__(self, visa_address='USB0::0xF4EC::0x1016::SDS3HA0D900710::INSTR'):
         """
         初始化示波器连接
@@ -13,26 +47,58 @@ class SiglentSDS3104X_DataAcquisition:
             visa_address: 示波器的VISA地址
                         可以通过 pyvisa.ResourceManager().list_resources() 查看可用设备
         """
-        self.rm = pyvisa.ResourceManager()
+        self.rm = self._get_rm()
         self.scope = None
         self.visa_address = visa_address
+        self._cleared = False  # 是否已执行过*CLS（只在首次连接时清一次）
+        # 缓存的示波器设置（由setup_acquisition填充，避免每个通道重复查询）
+        self._timebase = None
+        self._delay = None
+        self._sample_rate = None
+        self._ch_cfg = {}
+        # 按通道复用的采样缓冲区（懒分配；连续采集同长度记录时不再
+        # 反复分配大数组。按通道区分是因为通道1的保存可能还在后台
+        # 线程里读取缓冲区，此时通道2已经开始解析）
+        self._voltage_buf = {}
+        self._time_buf = {}
+        self._ramp_buf = {}
+        # 时间戳秒级前缀缓存（同一秒内多次采集只格式化毫秒部分）
+        self._date_cache = (None, None)
         
-    def connect(self):
-        """连接示波器"""
+    def connect(self, reconnect=False):
+        """连接示波器（已有会话存活时直接复用，除非reconnect=True）"""
         try:
+            # 会话还在时直接复用，省去重新打开VISA会话的50-200ms开销
+            if self.scope is not None and not reconnect:
+                try:
+                    self.scope.timeout = 100
+                    self.scope.query('*IDN?')
+                    self.scope.timeout = 10000
+                    return True
+                except Exception:
+                    # 会话已失效，走完整的重新连接流程
+                    self.scope = None
+
             self.scope = self.rm.open_resource(self.visa_address)
             # 设置超时时间为10秒
             self.scope.timeout = 10000
-            # 清除错误队列
-            self.scope.write('*CLS')
-            
+            # 长波形传输调优：1 MiB的传输块让长记录用百余次大块
+            # 传输完成，而不是上万次默认20 KB的小块；二进制数据里
+            # 会出现0x0A，不能按终止符断包，读取依赖USB-TMC的EOM
+            self.scope.chunk_size = 1 << 20
+            self.scope.read_termination = None
+            self.scope.write_termination = '\n'
+            # 清除错误队列（仅首次连接时需要）
+            if not self._cleared:
+                self.scope.write('*CLS')
+                self._cleared = True
+
             # 查询示波器ID以验证连接
             idn = self.scope.query('*IDN?')
             print(f"已连接到示波器: {idn}")
             
-            # 设置数据格式为ASCII（更易处理）
+            # 关闭命令头（波形格式在采集时设置为二进制WORD）
             self.scope.write('COMM_HEADER OFF')
-            self.scope.write('COMM_FORMAT ASCII')
             
             return True
         except Exception as e:
@@ -40,22 +106,26 @@ class SiglentSDS3104X_DataAcquisition:
             return False
     
     def setup_acquisition(self):
-        """设置采集参数（使用当前触发和采集方式）"""
+        """设置采集参数（使用当前触发和采集方式），并缓存设置供采集时复用"""
         try:
             # 获取当前设置（不改变示波器当前配置）
             """ print("使用示波器当前触发和采集设置...") """
-            
-            # 获取当前时间基准设置
-            timebase = self.scope.query('TIM:SCAL?')
-            """ print(f"当前时基: {timebase} s/div") """
-            
-            # 获取通道设置
+
+            # 获取并缓存与通道无关的设置，采集时不再重复查询
+            self._timebase = float(self.scope.query('TIM:SCAL?'))
+            self._delay = float(self.scope.query('TIM:DEL?'))
+            self._sample_rate = float(self.scope.query('ACQ:SRAT?'))
+            """ print(f"当前时基: {self._timebase} s/div") """
+
+            # 获取并缓存通道设置
             for ch in [1, 2]:
-                scale = self.scope.query(f'C{ch}:VOLT_DIV?')
-                offset = self.scope.query(f'C{ch}:OFFSET?')
+                scale = float(self.scope.query(f'C{ch}:VOLT_DIV?'))
+                offset = float(self.scope.query(f'C{ch}:OFFSET?'))
+                probe = float(self.scope.query(f'CHAN{ch}:PROB? '))
                 coupling = self.scope.query(f'C{ch}:COUPLING?')
+                self._ch_cfg[ch] = {'vdiv': scale, 'offset': offset, 'probe': probe}
                 """ print(f"通道{ch}: 垂直刻度={scale} V/div, 偏移={offset} V, 耦合={coupling}") """
-            
+
             # 获取触发设置
             trigger_source = self.scope.query('TRIG:EDGE:SOUR?')
             trigger_level = self.scope.query('TRIG:EDGE:LEV?')
@@ -69,68 +139,106 @@ class SiglentSDS3104X_DataAcquisition:
     def acquire_channel_data(self, channel):
         """采集指定通道的数据"""
         try:
-            # 选择通道
-            self.scope.write(f'CHDR OFF')  # 关闭头部信息
-            self.scope.write(f'C{channel}:TRACE ON')  # 确保通道开启
-            
-            # 设置波形参数为ASCII格式
-            self.scope.write('WFSU SP,1,NP,0,FP,0')  # 设置波形参数
-            resolution_type=self.scope.query('ACQ:TYPE? ')
-            # 获取波形数据
-            self.scope.write('WAV:WIDT WORD')
-            self.scope.write(f'C{channel}:WF? DAT2')  # 请求波形数据
-            
-            # 读取波形数据
-            raw_data = self.scope.read_raw()
-            
-            # 解析波形数据
-            # 跳过头部信息（找到#字符）
-            start_idx = raw_data.find(b'#')
-            if start_idx == -1:
-                raise ValueError("未找到波形数据头部")
-            
-            # 解析数据长度信息
-            header_length = int(chr(raw_data[start_idx + 1]))
-            data_length = int(raw_data[start_idx + 2:start_idx + 2 + header_length])
-            
-            # 提取实际数据
-            data_start = start_idx + 2 + header_length
-            data_bytes = raw_data[data_start:data_start + data_length]
-            
-            
-            
-            # 获取波形参数以进行缩放
+            self._request_waveform(channel)
+            return self._read_and_parse(channel)
+        except Exception as e:
+            print(f"采集通道{channel}数据失败: {e}")
+            return None
+
+    def _request_waveform(self, channel):
+        """发出指定通道的波形传输请求（不等待数据返回）"""
+        # 选择通道
+        self.scope.write(f'CHDR OFF')  # 关闭头部信息
+        self.scope.write(f'C{channel}:TRACE ON')  # 确保通道开启
+
+        # 设置波形参数，传输格式为二进制WORD（2字节/采样点，
+        # 覆盖10位分辨率且比ASCII传输快得多）
+        self.scope.write('WFSU SP,1,NP,0,FP,0')  # 设置波形参数
+        resolution_type=self.scope.query('ACQ:TYPE? ')
+        # 获取波形数据
+        self.scope.write('COMM_FORMAT DEF9,WORD,BIN')
+        self.scope.write(f'C{channel}:WF? DAT2')  # 请求波形数据
+
+    def _read_and_parse(self, channel):
+        """读取并解析之前请求的波形数据"""
+        # 读取波形数据
+        raw_data = self.scope.read_raw()
+
+        # 解析IEEE-488.2块头 #<n><数据长度>
+        # 通过memoryview切片提取数据，不复制波形字节
+        # （长记录在WORD模式下有几百MB，切片复制会让峰值内存翻倍）
+        mv = memoryview(raw_data)
+        start_idx = raw_data.index(b'#')
+        header_length = raw_data[start_idx + 1] - 0x30
+        data_length = int(bytes(mv[start_idx + 2:start_idx + 2 + header_length]))
+
+        # 提取实际数据（零拷贝视图）
+        data_start = start_idx + 2 + header_length
+        data_bytes = mv[data_start:data_start + data_length]
+
+
+        # 获取波形参数以进行缩放（优先使用setup_acquisition缓存的值，
+        # 每次查询都是一次完整的USB往返）
+        if channel in self._ch_cfg:
+            cfg = self._ch_cfg[channel]
+            vdiv, offset, probe = cfg['vdiv'], cfg['offset'], cfg['probe']
+        else:
             vdiv = float(self.scope.query(f'C{channel}:VOLT_DIV?'))
             offset = float(self.scope.query(f'C{channel}:OFFSET?'))
             probe = float(self.scope.query(f'CHAN{channel}:PROB? '))
-       
-            # 获取时间参数 
+
+        # 获取时间参数（与通道无关，同样走缓存）
+        if self._timebase is not None:
+            tdiv, delay, sample_rate = self._timebase, self._delay, self._sample_rate
+        else:
             tdiv = float(self.scope.query('TIM:SCAL? '))
             delay = float(self.scope.query('TIM:DEL?'))
             sample_rate = float(self.scope.query('ACQ:SRAT?'))
-            """  width= self.scope.query('WAV:WIDT?')
-            print(width) """
-            
-            
+        """  width= self.scope.query('WAV:WIDT?')
+        print(width) """
+        
+        
 
-            # 将字节数据转换为数值数组
-            # SDS3000X HD系列使用8位有符号整数
-            data_array = np.frombuffer(data_bytes, dtype=np.int16)
-            # 计算实际电压值
-            # SDS3000X HD的高分辨率模式数据为16位（65536点）
-            vertical_resolution = 65536
-            voltage_data = (data_array / vertical_resolution) * (vdiv * 8) *probe - offset
-            
-            # 计算时间轴
-            num_points = len(voltage_data)
-            time_data = np.linspace(delay - 5 * tdiv, delay + 5 * tdiv, num_points)
-            
-            # 获取当前时间戳
-            acquisition_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            
-            return {
-                'time': time_data,
-                'voltage': voltage_data,
+        # 将字节数据转换为数值数组
+        # WORD格式为小端16位有符号整数
+        data_array = np.frombuffer(data_bytes, dtype='<i2')
+        num_points = len(data_array)
+
+        # 记录长度不变时复用该通道上次的缓冲区，连续采集不再分配大数组
+        if channel not in self._voltage_buf or len(self._voltage_buf[channel]) != num_points:
+            self._voltage_buf[channel] = np.empty(num_points, dtype=np.float32)
+            self._time_buf[channel] = np.empty(num_points, dtype=np.float32)
+            self._ramp_buf[channel] = np.arange(num_points, dtype=np.float32)
+        voltage_data = self._voltage_buf[channel]
+        time_data = self._time_buf[channel]
+
+        # 计算实际电压值
+        # SDS3000X HD的高分辨率模式数据为16位（65536点）
+        # 缩放系数先在Python层算成标量，再用out=原地运算，
+        # 避免生成多个临时数组；float32精度对示波器数据绰绰有余
+        vertical_resolution = 65536
+        scale = (vdiv * 8.0 * probe) / vertical_resolution
+        np.multiply(data_array, scale, out=voltage_data)
+        np.subtract(voltage_data, offset, out=voltage_data)
+
+        # 计算时间轴（同样原地构造，等价于linspace）
+        if num_points > 1:
+            np.multiply(self._ramp_buf[channel], 10 * tdiv / (num_points - 1), out=time_data)
+        else:
+            time_data.fill(0.0)
+        time_data += delay - 5 * tdiv
+        
+        # 获取当前时间戳（秒级前缀走缓存，避免整串strftime的开销）
+        now = datetime.now()
+        second = now.replace(microsecond=0)
+        if second != self._date_cache[0]:
+            self._date_cache = (second, second.strftime('%Y-%m-%d %H:%M:%S'))
+        acquisition_time = f'{self._date_cache[1]}.{now.microsecond // 1000:03d}'
+        
+        return Waveform(
+            time=time_data,
+            voltage=voltage_data,
+            meta={
                 'acquisition_time': acquisition_time,
                 'channel': channel,
                 'vdiv': vdiv,
@@ -139,55 +247,49 @@ class SiglentSDS3104X_DataAcquisition:
                 'sample_rate': sample_rate,
                 'num_points': num_points
             }
-            
-        except Exception as e:
-            print(f"采集通道{channel}数据失败: {e}")
-            return None
+        )
     
-    def save_to_csv(self, data, save_dir='./testdata',filename=None):
-        """保存数据到CSV文件"""
+    def save_to_csv(self, waveform, save_dir='./testdata',filename=None, compress=False):
+        """保存Waveform到CSV文件（compress=True时写gzip压缩的.csv.gz，
+        数值ASCII可压缩5-10倍，磁盘慢时总耗时反而更短）"""
 
 
-        if data is None:
+        if waveform is None:
             return False
-        
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
 
-        
+        # exist_ok=True：两个通道的保存可能并发走到这里，
+        # 先检查后创建会在竞争时抛FileExistsError
+        os.makedirs(save_dir, exist_ok=True)
+
+
         if filename is None:
             # 生成默认文件名
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'Scope_Data_Ch{data["channel"]}_{timestamp}.csv'
+            filename = f'Scope_Data_Ch{waveform.meta["channel"]}_{timestamp}.csv'
             filepath = os.path.join(save_dir, filename)
-        
+
         try:
-            # 创建DataFrame
-            df = pd.DataFrame({
-                'Time (s)': data['time'],
-                'Voltage (V)': data['voltage']
-            })
-            
-            # 添加元数据作为注释
-            metadata = f"""# Siglent SDS3104X HD Oscilloscope Data
-# Acquisition Time: {data['acquisition_time']}
-# Channel: {data['channel']}
-# Vertical Scale: {data['vdiv']} V/div
-# Vertical Offset: {data['offset']} V
-# Timebase Scale: {data['tdiv']} s/div
-# Sample Rate: {data['sample_rate']:.2f} Sa/s
-# Number of Points: {data['num_points']}
-# Trigger Mode: Current Setting (Not Modified)
-# Acquisition Mode: Current Setting (Not Modified)
-"""
+            # 添加元数据作为注释（复用类级模板，一次填充）
+            metadata = self._META_TMPL.format_map(waveform.meta)
             
-            # 写入文件
-            with open(filepath, 'w') as f:
-                f.write(metadata)
-                df.to_csv(f, index=False)
-            
-            """ print(f"数据已保存到: {filepath}")
-            print(f"文件大小: {os.path.getsize(filepath)} 字节") """
+            # 写入文件（二进制模式 + np.savetxt，不经过DataFrame，
+            # 省去索引和逐值装箱的开销，数据量大时快数倍）
+            # compresslevel=1接近纯I/O速度，却已拿到大部分压缩收益
+            if compress:
+                filepath += '.gz'
+                f = gzip.open(filepath, 'wb', compresslevel=1)
+            else:
+                # 关掉raw句柄的默认缓冲，只留一层1 MiB的显式缓冲，
+                # 元数据、表头和数据行都经同一个写缓冲落盘
+                f = io.BufferedWriter(open(filepath, 'wb', buffering=0),
+                                      buffer_size=1 << 20)
+            with f:
+                f.write(metadata.encode())
+                f.write(b'Time (s),Voltage (V)\n')
+                np.savetxt(f, np.column_stack((waveform.time, waveform.voltage)),
+                           fmt='%.9e', delimiter=',')
+                """ print(f"数据已保存到: {filepath}")
+                print(f"文件大小: {f.tell()} 字节") """
             return True
             
         except Exception as e:
@@ -230,18 +332,32 @@ class SiglentSDS3104X_DataAcquisition:
         if not self.single_acquisition():
             return False
         
-        # 采集通道1数据
-        """ print("\n采集通道1数据...") """
-        ch1_data = self.acquire_channel_data(1)
-        if ch1_data:
-            self.save_to_csv(ch1_data,'./testdata')
-        
-        # 采集通道2数据
-        """ print("\n采集通道2数据...") """
-        ch2_data = self.acquire_channel_data(2)
-        if ch2_data:
-            self.save_to_csv(ch2_data,'./testdata')
-        
+        # 流水线式采集：通道2开始传输的同时，在后台线程保存通道1的数据，
+        # 传输和磁盘写入相互重叠
+        ch1_data = None
+        ch2_data = None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # 采集通道1数据
+            """ print("\n采集通道1数据...") """
+            try:
+                self._request_waveform(1)
+                ch1_data = self._read_and_parse(1)
+            except Exception as e:
+                print(f"采集通道1数据失败: {e}")
+
+            # 采集通道2数据（先发请求，再把通道1的保存交给后台线程）
+            """ print("\n采集通道2数据...") """
+            try:
+                self._request_waveform(2)
+                if ch1_data:
+                    save_future = pool.submit(self.save_to_csv, ch1_data, './testdata')
+                ch2_data = self._read_and_parse(2)
+            except Exception as e:
+                print(f"采集通道2数据失败: {e}")
+
+            if ch2_data:
+                self.save_to_csv(ch2_data, './testdata')
+
         return ch1_data is not None and ch2_data is not None
     
     def disconnect(self):
@@ -296,7 +412,7 @@ def main():
 
 if __name__ == "__main__":
     # 安装必要的库：
-    # pip install pyvisa numpy pandas pyvisa-py
+    # pip install pyvisa numpy pyvisa-py
     
     # 注意：需要安装VISA库
     # 1. 安装NI-VISA (National Instruments) 或